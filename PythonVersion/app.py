@@ -1,15 +1,28 @@
+import argparse
 import base64
+import gc
+import hashlib
 import json
 import os
 import re
+import shutil
 import sys
+import tempfile
 import threading
+import time
+import tracemalloc
+from collections import deque
 from pathlib import Path
 
 import requests
 from pynput import keyboard
 from PySide6 import QtCore, QtGui, QtWidgets, QtWebEngineCore, QtWebEngineWidgets
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
 
 DEFAULT_CONFIG = {
     "api_base_url": "",
@@ -17,8 +30,19 @@ DEFAULT_CONFIG = {
     "api_model": "gpt-5.2",
     "copy_format": "latex",
     "hotkey": "<ctrl>+<shift>+A",
+    "quick_copy": False,
+    "cache_url": "",
+    "cache_timeout": 0.5,
+    "prefetch": False,
+    "prefetch_budget": 3,
+    "telemetry": False,
+    "telemetry_interval": 30,
+    "memory_cap_mb": 800,
+    "webengine_cap_mb": 600,
 }
 
+MB = 1024 * 1024
+
 
 def get_config_dir():
     if os.name == "nt":
@@ -36,27 +60,202 @@ def resource_path(relative_path):
     return base_dir / relative_path
 
 
-class AppSettings:
-    def __init__(self):
+def _validate_text(value):
+    if not isinstance(value, str):
+        raise ValueError("expected a string")
+    return value.strip()
+
+
+def _validate_model(value):
+    value = _validate_text(value)
+    if not value:
+        raise ValueError("model name is empty")
+    return value
+
+
+def _validate_copy_format(value):
+    if value not in ("latex", "mathml"):
+        raise ValueError("expected latex or mathml")
+    return value
+
+
+def _validate_hotkey(value):
+    value = _validate_text(value)
+    keyboard.HotKey.parse(value)
+    return value
+
+
+def _validate_bool(value):
+    if not isinstance(value, bool):
+        raise ValueError("expected true or false")
+    return value
+
+
+def _validate_timeout(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError("expected a number")
+    if not 0 < value <= 10:
+        raise ValueError("expected 0 < timeout <= 10")
+    return float(value)
+
+
+def _validate_int_range(low, high):
+    def validate(value):
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError("expected an integer")
+        if not low <= value <= high:
+            raise ValueError(f"expected {low} <= value <= {high}")
+        return value
+
+    return validate
+
+
+SETTINGS_SCHEMA = {
+    "api_base_url": _validate_text,
+    "api_key": _validate_text,
+    "api_model": _validate_model,
+    "copy_format": _validate_copy_format,
+    "hotkey": _validate_hotkey,
+    "quick_copy": _validate_bool,
+    "cache_url": _validate_text,
+    "cache_timeout": _validate_timeout,
+    "prefetch": _validate_bool,
+    "prefetch_budget": _validate_int_range(1, 10),
+    "telemetry": _validate_bool,
+    "telemetry_interval": _validate_int_range(5, 3600),
+    "memory_cap_mb": _validate_int_range(100, 65536),
+    "webengine_cap_mb": _validate_int_range(100, 65536),
+}
+
+
+class AppSettings(QtCore.QObject):
+    changed = QtCore.Signal(object)
+    invalid = QtCore.Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
         self.path = os.path.join(get_config_dir(), "config.json")
         self.data = dict(DEFAULT_CONFIG)
+        self.load_errors = {}
+        self.parse_error = None
         self.load()
 
-    def load(self):
+        self.reload_timer = QtCore.QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.timeout.connect(self.reload)
+        self.watcher = QtCore.QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._schedule_reload)
+        self.watcher.directoryChanged.connect(self._schedule_reload)
+        self._watch()
+
+    @staticmethod
+    def validate(raw):
+        values = {}
+        errors = {}
+        for key, value in raw.items():
+            validator = SETTINGS_SCHEMA.get(key)
+            if validator is None:
+                continue
+            try:
+                values[key] = validator(value)
+            except ValueError as exc:
+                errors[key] = str(exc) or "invalid value"
+        return values, errors
+
+    def _read(self):
         if not os.path.exists(self.path):
-            return
+            return None, None
         try:
             with open(self.path, "r", encoding="utf-8") as handle:
                 raw = json.load(handle)
-            if isinstance(raw, dict):
-                self.data.update(raw)
-        except (OSError, json.JSONDecodeError):
-            pass
+        except (OSError, json.JSONDecodeError) as exc:
+            return None, str(exc)
+        if not isinstance(raw, dict):
+            return None, "expected a JSON object"
+        return raw, None
+
+    def _parse_failed(self, error):
+        self.parse_error = error
+        return {
+            "config.json": f"{error}; it will be backed up to config.json.bak "
+            "before the next save"
+        }
+
+    def load(self):
+        raw, error = self._read()
+        if error:
+            self.load_errors = self._parse_failed(error)
+            return
+        if raw:
+            values, self.load_errors = self.validate(raw)
+            self.data.update(values)
+
+    def report_load_errors(self):
+        if self.load_errors:
+            self.invalid.emit(self.load_errors)
+            self.load_errors = {}
+
+    def reload(self):
+        self._watch()
+        raw, error = self._read()
+        if error:
+            self.invalid.emit(self._parse_failed(error))
+            return
+        if raw is None:
+            return
+        self.parse_error = None
+        values, errors = self.validate(raw)
+        for key, default in DEFAULT_CONFIG.items():
+            if key not in raw:
+                values[key] = default
+        if errors:
+            self.invalid.emit(errors)
+        self.update(values, persist=False)
+
+    def update(self, values, persist=True):
+        values, errors = self.validate(values)
+        changed = {key for key, value in values.items() if self.data.get(key) != value}
+        self.data.update(values)
+        if persist and changed:
+            self.save()
+        if changed:
+            self.changed.emit(changed)
+        return errors
 
     def save(self):
-        os.makedirs(os.path.dirname(self.path), exist_ok=True)
-        with open(self.path, "w", encoding="utf-8") as handle:
-            json.dump(self.data, handle, indent=2)
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        if self.parse_error and os.path.exists(self.path):
+            shutil.copyfile(self.path, f"{self.path}.bak")
+        self.parse_error = None
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=".config-", suffix=".json", dir=directory
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(self.data, handle, indent=2)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._watch()
+
+    def _watch(self):
+        directory = os.path.dirname(self.path)
+        if os.path.isdir(directory) and directory not in self.watcher.directories():
+            self.watcher.addPath(directory)
+        if os.path.exists(self.path) and self.path not in self.watcher.files():
+            self.watcher.addPath(self.path)
+
+    def _schedule_reload(self, _path):
+        self.reload_timer.start(200)
+
+
+def format_settings_errors(errors):
+    return ", ".join(f"{key}: {message}" for key, message in errors.items())
 
 
 def strip_latex_markers(text):
@@ -97,6 +296,7 @@ class SelectionOverlay(QtWidgets.QWidget):
         self.setGeometry(self.screen_geometry)
         self.pixmap = screen.grabWindow(0)
         self.origin = None
+        self.selection_rect = None
         self.rubber_band = QtWidgets.QRubberBand(
             QtWidgets.QRubberBand.Rectangle, self
         )
@@ -140,6 +340,7 @@ class SelectionOverlay(QtWidgets.QWidget):
             int(rect.width() * dpr),
             int(rect.height() * dpr),
         )
+        self.selection_rect = rect_px
         selected = self.pixmap.copy(rect_px)
         image = selected.toImage()
         self.selection_made.emit(image)
@@ -186,6 +387,12 @@ class SettingsDialog(QtWidgets.QDialog):
         self.copy_format.addItems(["latex", "mathml"])
         self.copy_format.setCurrentText(settings.data.get("copy_format", "latex"))
         self.hotkey = QtWidgets.QLineEdit(settings.data.get("hotkey", ""))
+        self.quick_copy = QtWidgets.QCheckBox("识别完成后立即复制，界面稍后更新")
+        self.quick_copy.setChecked(bool(settings.data.get("quick_copy", False)))
+        self.cache_url = QtWidgets.QLineEdit(settings.data.get("cache_url", ""))
+        self.cache_url.setPlaceholderText("http://127.0.0.1:8765 (留空则不使用)")
+        self.prefetch = QtWidgets.QCheckBox("截图时预先识别屏幕上疑似公式的区域")
+        self.prefetch.setChecked(bool(settings.data.get("prefetch", False)))
 
         form.addRow("API Base URL", self.api_url)
         form.addRow("API Key", self.api_key)
@@ -200,6 +407,9 @@ class SettingsDialog(QtWidgets.QDialog):
         form.addRow("Model", model_container)
         form.addRow("Copy Format", self.copy_format)
         form.addRow("Hotkey", self.hotkey)
+        form.addRow("Quick Copy", self.quick_copy)
+        form.addRow("Shared Cache", self.cache_url)
+        form.addRow("Prefetch", self.prefetch)
 
         api_hint = QtWidgets.QLabel("API Base URL 填到 /v1 即可，例如: https://api.openai.com/v1")
         api_hint.setStyleSheet("color: #6b7280;")
@@ -233,6 +443,9 @@ class SettingsDialog(QtWidgets.QDialog):
             "api_model": model_value,
             "copy_format": self.copy_format.currentText().strip(),
             "hotkey": self.hotkey.text().strip(),
+            "quick_copy": self.quick_copy.isChecked(),
+            "cache_url": self.cache_url.text().strip(),
+            "prefetch": self.prefetch.isChecked(),
         }
 
     def _toggle_custom_model(self):
@@ -261,12 +474,345 @@ def extract_output_text(output):
     return "\n".join(parts)
 
 
+def image_cache_keys(image, model):
+    rgb = image.convertToFormat(QtGui.QImage.Format_RGB32)
+    digest = hashlib.sha256()
+    digest.update(model.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(f"{rgb.width()}x{rgb.height()}".encode("ascii"))
+    digest.update(bytes(rgb.constBits()))
+    return [f"sha256:{digest.hexdigest()}"]
+
+
+def _ink_runs(flags, max_gap=0):
+    runs = []
+    start = None
+    gap = 0
+    for index in range(len(flags) + 1):
+        filled = index < len(flags) and flags[index]
+        if filled:
+            if start is None:
+                start = index
+            gap = 0
+        elif start is not None:
+            gap += 1
+            if gap > max_gap or index == len(flags):
+                runs.append((start, index - gap + 1))
+                start = None
+                gap = 0
+    return runs
+
+
+def _formula_boxes(rows, width, height):
+    sample = sorted(value for row in rows[::8] for value in row[::8])
+    if sample and sample[len(sample) // 2] < 128:
+        ink = [[value > 145 for value in row] for row in rows]
+    else:
+        ink = [[value < 110 for value in row] for row in rows]
+
+    for row in ink:
+        if sum(row) > width * 0.6:
+            row[:] = [False] * width
+    column_ink = [sum(ink[y][x] for y in range(height)) for x in range(width)]
+    solid = [count > height * 0.6 for count in column_ink]
+    for row in ink:
+        for x in range(width):
+            if solid[x]:
+                row[x] = False
+    blocks = _ink_runs(
+        [column_ink[x] > 0 and not solid[x] for x in range(width)], max_gap=6
+    )
+
+    candidates = []
+    for block_left, block_right in blocks:
+        block_width = block_right - block_left
+        if block_width < 12:
+            continue
+        row_counts = [sum(ink[y][block_left:block_right]) for y in range(height)]
+        bands = _ink_runs(
+            [0 < count <= block_width * 0.6 for count in row_counts]
+        )
+        if not bands:
+            continue
+        band_heights = sorted(end - begin for begin, end in bands)
+        median_height = max(1, band_heights[len(band_heights) // 2])
+        block_center = (block_left + block_right) / 2
+        for top, bottom in bands:
+            band_height = bottom - top
+            if band_height < 4 or band_height > height // 2:
+                continue
+            columns = [
+                any(ink[y][x] for y in range(top, bottom))
+                for x in range(block_left, block_right)
+            ]
+            segments = _ink_runs(columns, max_gap=12)
+            for seg_left, seg_right in segments:
+                left = block_left + seg_left
+                right = block_left + seg_right
+                seg_width = right - left
+                if seg_width < 12 or seg_width > block_width * 0.9:
+                    continue
+                filled = sum(
+                    ink[y][x] for y in range(top, bottom) for x in range(left, right)
+                )
+                density = filled / (seg_width * band_height)
+                if not 0.03 <= density <= 0.5:
+                    continue
+                center = (left + right) / 2
+                centered = 1 - abs(center - block_center) / (block_width / 2)
+                score = band_height / median_height + centered
+                if len(segments) == 1:
+                    score += 0.5
+                candidates.append((score, left, top, right, bottom))
+    candidates.sort(reverse=True)
+    return candidates
+
+
+def detect_formula_regions(image, limit=3):
+    if image.width() < 64 or image.height() < 64:
+        return []
+    scale = min(1.0, 480 / image.width())
+    small = image.scaled(
+        max(1, int(image.width() * scale)),
+        max(1, int(image.height() * scale)),
+        QtCore.Qt.IgnoreAspectRatio,
+        QtCore.Qt.SmoothTransformation,
+    ).convertToFormat(QtGui.QImage.Format_Grayscale8)
+    width = small.width()
+    height = small.height()
+    stride = small.bytesPerLine()
+    pixels = bytes(small.constBits())
+    rows = [pixels[y * stride : y * stride + width] for y in range(height)]
+
+    regions = []
+    pad = 4
+    for _, left, top, right, bottom in _formula_boxes(rows, width, height)[:limit]:
+        rect = QtCore.QRect(
+            int((left - pad) / scale),
+            int((top - pad) / scale),
+            int((right - left + 2 * pad) / scale),
+            int((bottom - top + 2 * pad) / scale),
+        )
+        ink_rect = QtCore.QRect(
+            int(left / scale),
+            int(top / scale),
+            max(1, int((right - left) / scale)),
+            max(1, int((bottom - top) / scale)),
+        )
+        regions.append((rect.intersected(image.rect()), ink_rect))
+    return regions
+
+
+def rect_coverage(inner, outer):
+    if inner.isEmpty():
+        return 0.0
+    inter = inner.intersected(outer)
+    if inter.isEmpty():
+        return 0.0
+    return (inter.width() * inter.height()) / (inner.width() * inner.height())
+
+
+class PrefetchJob:
+    def __init__(self, rect, ink_rect):
+        self.rect = rect
+        self.ink_rect = ink_rect
+        self.done = threading.Event()
+        self.latex = None
+
+
+class SharedCacheClient:
+    def __init__(self, base_url, timeout=0.5, negative_ttl=600, backoff=60):
+        self.base_url = base_url.strip().rstrip("/")
+        self.timeout = timeout
+        self.negative_ttl = negative_ttl
+        self.backoff = backoff
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self.negative = {}
+        self.disabled_until = 0.0
+
+    def lookup(self, keys):
+        hits = self.lookup_many(keys)
+        for key in keys:
+            if key in hits:
+                return hits[key]
+        return None
+
+    def lookup_many(self, keys):
+        now = time.monotonic()
+        with self.lock:
+            if now < self.disabled_until:
+                return {}
+            pending = [key for key in keys if self.negative.get(key, 0) <= now]
+        if not pending:
+            return {}
+        try:
+            resp = self.session.post(
+                f"{self.base_url}/lookup",
+                json={"keys": pending},
+                timeout=self.timeout,
+            )
+            resp.raise_for_status()
+            body = resp.json()
+            results = body.get("results") if isinstance(body, dict) else None
+            if not isinstance(results, dict):
+                raise ValueError("malformed cache response")
+        except (requests.RequestException, ValueError):
+            with self.lock:
+                self.disabled_until = now + self.backoff
+            return {}
+        hits = {
+            key: results[key]
+            for key in pending
+            if isinstance(results.get(key), str) and results[key]
+        }
+        with self.lock:
+            if len(self.negative) > 1024:
+                self._prune_negative(now)
+            for key in pending:
+                if key not in hits:
+                    self.negative[key] = now + self.negative_ttl
+        return hits
+
+    def trim(self):
+        with self.lock:
+            self._prune_negative(time.monotonic())
+
+    def _prune_negative(self, now):
+        self.negative = {
+            key: expiry for key, expiry in self.negative.items() if expiry > now
+        }
+
+    def publish(self, keys, latex):
+        if not keys or not latex:
+            return
+
+        def worker():
+            try:
+                resp = self.session.post(
+                    f"{self.base_url}/publish",
+                    json={"entries": [{"key": key, "latex": latex} for key in keys]},
+                    timeout=max(self.timeout, 2),
+                )
+                resp.raise_for_status()
+            except requests.RequestException:
+                return
+            with self.lock:
+                for key in keys:
+                    self.negative.pop(key, None)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+
+def read_rss(pid=None):
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return None
+    path = f"/proc/{pid or 'self'}/status"
+    try:
+        with open(path, "r", encoding="ascii") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+class ResourceMonitor(QtCore.QObject):
+    sampled = QtCore.Signal(object)
+
+    def __init__(self, webview, interval_s=30, parent=None):
+        super().__init__(parent)
+        self.webview = webview
+        self.telemetry = False
+        self._started_tracing = False
+        self.samples = deque(maxlen=720)
+        self.log_path = os.path.join(get_config_dir(), "telemetry.jsonl")
+        self.snapshot_every = 10
+        self._sample_count = 0
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self.sample)
+        self.set_interval(interval_s)
+
+    def set_interval(self, interval_s):
+        self.timer.setInterval(int(interval_s * 1000))
+
+    def set_telemetry(self, enabled):
+        self.telemetry = enabled
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        elif not enabled and self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def start(self):
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        self.set_telemetry(False)
+
+    def sample(self):
+        render_pid = self.webview.page().renderProcessPid()
+        sample = {
+            "time": time.time(),
+            "rss": read_rss(),
+            "py_heap": None,
+            "py_heap_peak": None,
+            "webengine_rss": read_rss(render_pid) if render_pid > 0 else None,
+            "threads": threading.active_count(),
+        }
+        if self.telemetry:
+            sample["py_heap"], sample["py_heap_peak"] = tracemalloc.get_traced_memory()
+            self._sample_count += 1
+            if self._sample_count % self.snapshot_every == 0:
+                snapshot = tracemalloc.take_snapshot()
+                top = snapshot.statistics("lineno")[:5]
+                sample["py_top"] = [str(stat) for stat in top]
+            self.samples.append(sample)
+            self._write(sample)
+        self.sampled.emit(sample)
+        return sample
+
+    def _write(self, sample):
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            if (
+                os.path.exists(self.log_path)
+                and os.path.getsize(self.log_path) > 2 * MB
+            ):
+                os.replace(self.log_path, f"{self.log_path}.1")
+            with open(self.log_path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(sample) + "\n")
+        except OSError:
+            pass
+
+
+def make_soak_capture(screen, index):
+    overlay = SelectionOverlay(screen)
+    width = max(8, min(640, overlay.pixmap.width()))
+    height = max(8, min(160, overlay.pixmap.height()))
+    image = overlay.pixmap.copy(QtCore.QRect(0, 0, width, height)).toImage()
+    overlay.deleteLater()
+    painter = QtGui.QPainter(image)
+    painter.fillRect(image.rect(), QtGui.QColor(255, 255, 255))
+    painter.setPen(QtGui.QColor(0, 0, 0))
+    painter.drawText(image.rect(), QtCore.Qt.AlignCenter, f"x_{index} = {index} / 7")
+    painter.end()
+    return image, f"x_{{{index}}} = \\frac{{{index}}}{{7}}"
+
+
 class LatexOCRWindow(QtWidgets.QMainWindow):
     def __init__(self):
         super().__init__()
-        self.settings = AppSettings()
+        self.settings = AppSettings(self)
         self.signals = SignalBus()
         self.http_session = requests.Session()
+        self.shared_cache = self._make_shared_cache()
 
         self.setWindowTitle("LaTeXOCR for 415课题组")
         self.resize(1120, 620)
@@ -279,6 +825,19 @@ class LatexOCRWindow(QtWidgets.QMainWindow):
         self.preview_ready = False
         self.current_image = None
         self._pending_preview_text = ""
+        self._deferred_result = None
+        self.prefetch_lock = threading.Lock()
+        self.prefetch_jobs = []
+        self.prefetch_generation = 0
+        self.prefetch_exclude = None
+        self.resource_monitor = None
+        self._soak_total = 0
+        self._soak_index = 0
+        self._soak_timer = None
+        self._soak_first = None
+        self._soak_max_growth_mb = 50
+        self._preview_recycled_at = None
+        self._memory_trimmed_at = None
         self.preview_timer = QtCore.QTimer(self)
         self.preview_timer.setSingleShot(True)
         self.preview_timer.timeout.connect(self._refresh_preview_from_editor)
@@ -292,7 +851,146 @@ class LatexOCRWindow(QtWidgets.QMainWindow):
         self._build_ui()
         self._apply_styles()
         self._connect_signals()
+        self.settings.changed.connect(self._on_settings_changed)
+        self.settings.invalid.connect(self._on_settings_invalid)
+        self.settings.report_load_errors()
         self._start_hotkey()
+        self._configure_resource_monitor()
+
+    def _make_shared_cache(self):
+        cache_url = self.settings.data.get("cache_url", "").strip()
+        if not cache_url:
+            return None
+        try:
+            timeout = float(self.settings.data.get("cache_timeout", 0.5))
+        except (TypeError, ValueError):
+            timeout = DEFAULT_CONFIG["cache_timeout"]
+        return SharedCacheClient(cache_url, timeout=timeout)
+
+    def _on_settings_changed(self, keys):
+        if keys & {"api_base_url", "api_key"}:
+            self.http_session.close()
+            self.http_session = requests.Session()
+        if keys & {"cache_url", "cache_timeout"}:
+            self.shared_cache = self._make_shared_cache()
+        if "hotkey" in keys:
+            self._start_hotkey()
+        if keys & {"telemetry", "telemetry_interval"}:
+            self._configure_resource_monitor()
+
+    def _on_settings_invalid(self, errors):
+        details = format_settings_errors(errors)
+        self._set_status(f"Invalid settings ignored ({details}).")
+
+    def _configure_resource_monitor(self):
+        telemetry = bool(self.settings.data.get("telemetry") or self._soak_total)
+        interval = self.settings.data.get("telemetry_interval", 30)
+        if self.resource_monitor is None:
+            self.resource_monitor = ResourceMonitor(self.webview, interval, self)
+            self.resource_monitor.sampled.connect(self._on_resource_sample)
+        else:
+            self.resource_monitor.set_interval(interval)
+        self.resource_monitor.set_telemetry(telemetry)
+        self.resource_monitor.start()
+
+    def _on_resource_sample(self, sample):
+        memory_cap = self.settings.data.get("memory_cap_mb", 800) * MB
+        webengine_cap = self.settings.data.get("webengine_cap_mb", 600) * MB
+        if sample.get("rss") and sample["rss"] > memory_cap:
+            cooldown_over = (
+                self._memory_trimmed_at is None
+                or time.monotonic() - self._memory_trimmed_at > 600
+            )
+            if cooldown_over:
+                self._trim_memory()
+        webengine_rss = sample.get("webengine_rss")
+        if webengine_rss and webengine_rss > webengine_cap:
+            cooldown_over = (
+                self._preview_recycled_at is None
+                or time.monotonic() - self._preview_recycled_at > 600
+            )
+            if cooldown_over:
+                self._recycle_preview_page()
+
+    def _trim_memory(self):
+        self._memory_trimmed_at = time.monotonic()
+        if self.isHidden() or self.isMinimized():
+            self.current_image = None
+            self.image_label.clear()
+            self.image_label.setText("No screenshot yet.")
+        self._cancel_prefetch()
+        if self.shared_cache is not None:
+            self.shared_cache.trim()
+        QtGui.QPixmapCache.clear()
+        gc.collect()
+
+    def _recycle_preview_page(self):
+        self._preview_recycled_at = time.monotonic()
+        self.preview_ready = False
+        self.webview.setPage(QtWebEngineCore.QWebEnginePage(self.webview))
+        self._load_preview_page()
+
+    def _load_preview_page(self):
+        html_path = resource_path("assets/katex_preview.html")
+        self.webview.setUrl(QtCore.QUrl.fromLocalFile(str(html_path)))
+        self.webview.settings().setAttribute(
+            QtWebEngineCore.QWebEngineSettings.ShowScrollBars, False
+        )
+
+    def start_soak(self, count, max_growth_mb=50):
+        self._soak_total = count
+        self._soak_max_growth_mb = max_growth_mb
+        self._soak_index = 0
+        self._configure_resource_monitor()
+        self._soak_first = self.resource_monitor.sample()
+        print(f"soak start: {self._format_sample(self._soak_first)}", flush=True)
+        self._soak_timer = QtCore.QTimer(self)
+        self._soak_timer.timeout.connect(self._soak_step)
+        self._soak_timer.start(0)
+
+    def _soak_step(self):
+        if self._soak_index >= self._soak_total:
+            self._soak_timer.stop()
+            self._finish_soak()
+            return
+        screen = QtGui.QGuiApplication.primaryScreen()
+        image, latex = make_soak_capture(screen, self._soak_index)
+        self.current_image = image
+        self._update_image_preview(image)
+        self.signals.ocr_success.emit(latex)
+        self._soak_index += 1
+        if self._soak_index % 100 == 0:
+            sample = self.resource_monitor.sample()
+            print(
+                f"soak {self._soak_index}/{self._soak_total}: "
+                f"{self._format_sample(sample)}",
+                flush=True,
+            )
+
+    def _finish_soak(self):
+        gc.collect()
+        last = self.resource_monitor.sample()
+        growth = ((last["rss"] or 0) - (self._soak_first["rss"] or 0)) / MB
+        print(f"soak done: {self._format_sample(last)}", flush=True)
+        print(f"soak rss growth: {growth:+.1f} MB", flush=True)
+        if growth > self._soak_max_growth_mb:
+            print(
+                f"soak failed: growth exceeds {self._soak_max_growth_mb:.1f} MB",
+                flush=True,
+            )
+            QtWidgets.QApplication.exit(1)
+            return
+        QtWidgets.QApplication.exit(0)
+
+    @staticmethod
+    def _format_sample(sample):
+        def mb(value):
+            return "n/a" if value is None else f"{value / MB:.1f} MB"
+
+        return (
+            f"rss={mb(sample['rss'])} py_heap={mb(sample['py_heap'])} "
+            f"webengine={mb(sample['webengine_rss'])} threads={sample['threads']}"
+        )
 
     def _build_ui(self):
         central = QtWidgets.QWidget()
@@ -352,11 +1050,7 @@ class LatexOCRWindow(QtWidgets.QMainWindow):
 
         self.preview_card = self._make_card("KaTeX Preview")
         self.webview = QtWebEngineWidgets.QWebEngineView()
-        html_path = resource_path("assets/katex_preview.html")
-        self.webview.setUrl(QtCore.QUrl.fromLocalFile(str(html_path)))
-        self.webview.settings().setAttribute(
-            QtWebEngineCore.QWebEngineSettings.ShowScrollBars, False
-        )
+        self._load_preview_page()
         self.preview_card["body"].layout().addWidget(self.webview)
         self.preview_card["frame"].setMinimumHeight(200)
         self.preview_card["frame"].setSizePolicy(
@@ -550,6 +1244,7 @@ class LatexOCRWindow(QtWidgets.QMainWindow):
             screen = QtGui.QGuiApplication.primaryScreen()
         self._set_status("Drag to select area (Esc to cancel).")
         overlay = SelectionOverlay(screen)
+        self._start_prefetch(overlay.pixmap)
         loop = QtCore.QEventLoop()
         result = {"image": None}
 
@@ -567,12 +1262,93 @@ class LatexOCRWindow(QtWidgets.QMainWindow):
         loop.exec()
 
         image = result["image"]
+        selection_rect = overlay.selection_rect
+        overlay.deleteLater()
         if image is None:
+            self._cancel_prefetch()
             self._set_status("Capture canceled.")
             return
         self.current_image = image
         self._update_image_preview(image)
-        self._run_ocr(image)
+        prefetch_job = self._match_prefetch(selection_rect)
+        if prefetch_job is None:
+            self._cancel_prefetch()
+        else:
+            with self.prefetch_lock:
+                self.prefetch_exclude = selection_rect
+        self._run_ocr(image, prefetch_job)
+
+    def _start_prefetch(self, pixmap):
+        with self.prefetch_lock:
+            self.prefetch_generation += 1
+            self.prefetch_jobs = []
+            self.prefetch_exclude = None
+            generation = self.prefetch_generation
+        api = self._api_settings()
+        if not self.settings.data.get("prefetch") or api is None:
+            return
+        budget = self.settings.data.get("prefetch_budget", 3)
+        shared_cache = self.shared_cache
+        screenshot = pixmap.toImage()
+
+        def worker():
+            nonlocal screenshot
+            crops = [
+                (rect, ink_rect, screenshot.copy(rect))
+                for rect, ink_rect in detect_formula_regions(screenshot, budget)
+            ]
+            screenshot = None
+            cached = [None] * len(crops)
+            if shared_cache is not None and crops:
+                keys = [image_cache_keys(crop, api[2])[0] for _, _, crop in crops]
+                hits = shared_cache.lookup_many(keys)
+                cached = [hits.get(key) for key in keys]
+            while crops:
+                rect, ink_rect, crop = crops.pop(0)
+                latex = cached.pop(0)
+                job = PrefetchJob(rect, ink_rect)
+                with self.prefetch_lock:
+                    if generation != self.prefetch_generation:
+                        return
+                    exclude = self.prefetch_exclude
+                    if exclude is not None and rect.intersects(exclude):
+                        continue
+                    self.prefetch_jobs.append(job)
+                if latex:
+                    job.latex = latex
+                    job.done.set()
+                    continue
+                try:
+                    job.latex = self._request_latex(crop, *api, shared_cache)
+                except Exception:
+                    job.latex = None
+                finally:
+                    job.done.set()
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _cancel_prefetch(self):
+        with self.prefetch_lock:
+            self.prefetch_generation += 1
+            self.prefetch_jobs = []
+            self.prefetch_exclude = None
+
+    def _match_prefetch(self, rect):
+        if rect is None:
+            return None
+        with self.prefetch_lock:
+            jobs = list(self.prefetch_jobs)
+        best = None
+        best_coverage = 0.9
+        for job in jobs:
+            coverage = rect_coverage(job.ink_rect, rect)
+            if coverage < best_coverage:
+                continue
+            if rect_coverage(rect, job.rect) < 0.5:
+                continue
+            best = job
+            best_coverage = coverage
+        return best
 
     def _update_image_preview(self, image):
         pixmap = QtGui.QPixmap.fromImage(image)
@@ -584,60 +1360,83 @@ class LatexOCRWindow(QtWidgets.QMainWindow):
         )
         self.image_label.setPixmap(scaled)
 
-    def _run_ocr(self, image):
+    def _api_settings(self):
         api_url = self.settings.data.get("api_base_url", "").strip()
         api_key = self.settings.data.get("api_key", "").strip()
         model = self.settings.data.get("api_model", "").strip()
         if not api_url or not api_key or not model:
+            return None
+        return api_url, api_key, model
+
+    def _request_latex(self, image, api_url, api_key, model, shared_cache):
+        cache_keys = []
+        if shared_cache is not None:
+            cache_keys = image_cache_keys(image, model)
+            cached = shared_cache.lookup(cache_keys)
+            if cached:
+                return cached
+        buffer = QtCore.QBuffer()
+        buffer.open(QtCore.QIODevice.ReadWrite)
+        image.save(buffer, "JPG", quality=90)
+        image_b64 = base64.b64encode(buffer.data()).decode("ascii")
+        base_url = normalize_base_url(api_url)
+        request_url = f"{base_url}/responses"
+        payload = {
+            "model": model,
+            "input": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "input_text",
+                            "text": (
+                                "Please transcribe it into LaTeX format. "
+                                "please only return LaTeX formula without any "
+                                "other unuseful symbol, so I can patse it to my "
+                                "doc directly."
+                            ),
+                        },
+                        {
+                            "type": "input_image",
+                            "image_url": f"data:image/jpeg;base64,{image_b64}",
+                        },
+                    ],
+                }
+            ],
+        }
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+        resp = self.http_session.post(
+            request_url, json=payload, headers=headers, timeout=60
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        latex = extract_output_text(data.get("output", []))
+        latex = strip_latex_markers(latex)
+        if shared_cache is not None:
+            shared_cache.publish(cache_keys, latex)
+        return latex
+
+    def _run_ocr(self, image, prefetch_job=None):
+        api = self._api_settings()
+        if api is None:
             self._set_status("Missing API settings.")
             self.open_settings()
             return
 
         self._set_status("OCR in progress...")
         self.progress.setVisible(True)
+        shared_cache = self.shared_cache
 
         def worker():
-            buffer = QtCore.QBuffer()
-            buffer.open(QtCore.QIODevice.ReadWrite)
-            image.save(buffer, "JPG", quality=90)
-            image_b64 = base64.b64encode(buffer.data()).decode("ascii")
-            base_url = normalize_base_url(api_url)
-            request_url = f"{base_url}/responses"
-            payload = {
-                "model": model,
-                "input": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "input_text",
-                                "text": (
-                                    "Please transcribe it into LaTeX format. "
-                                    "please only return LaTeX formula without any "
-                                    "other unuseful symbol, so I can patse it to my "
-                                    "doc directly."
-                                ),
-                            },
-                            {
-                                "type": "input_image",
-                                "image_url": f"data:image/jpeg;base64,{image_b64}",
-                            },
-                        ],
-                    }
-                ],
-            }
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
+            if prefetch_job is not None and prefetch_job.done.wait(60):
+                if prefetch_job.latex:
+                    self.signals.ocr_success.emit(prefetch_job.latex)
+                    return
             try:
-                resp = self.http_session.post(
-                    request_url, json=payload, headers=headers, timeout=60
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                latex = extract_output_text(data.get("output", []))
-                latex = strip_latex_markers(latex)
+                latex = self._request_latex(image, *api, shared_cache)
                 self.signals.ocr_success.emit(latex)
             except Exception as exc:
                 self.signals.ocr_error.emit(str(exc))
@@ -645,6 +1444,9 @@ class LatexOCRWindow(QtWidgets.QMainWindow):
         threading.Thread(target=worker, daemon=True).start()
 
     def _on_ocr_success(self, latex):
+        if self.settings.data.get("quick_copy"):
+            self._on_ocr_success_quick(latex)
+            return
         self.progress.setVisible(False)
         self.latex_text.setPlainText(latex)
         self._set_status("OCR complete.")
@@ -654,6 +1456,46 @@ class LatexOCRWindow(QtWidgets.QMainWindow):
         else:
             self.copy_latex()
 
+    def _on_ocr_success_quick(self, latex):
+        self.progress.setVisible(False)
+        if self.settings.data.get("copy_format") == "mathml":
+            self._quick_copy_mathml(latex)
+        elif latex:
+            self._set_clipboard(latex)
+            self._set_status("LaTeX copied.", duration_ms=3000)
+        else:
+            self._set_status("No LaTeX to copy.", duration_ms=3000)
+        if self.isHidden() or self.isMinimized():
+            self._deferred_result = latex
+            return
+        self._deferred_result = None
+        QtCore.QTimer.singleShot(0, lambda: self.latex_text.setPlainText(latex))
+
+    def _quick_copy_mathml(self, latex):
+        if not latex:
+            self._set_status("No LaTeX to convert.", duration_ms=3000)
+            return
+        if not self.preview_ready:
+            self._set_status("MathML not ready.", duration_ms=3000)
+            return
+
+        def handle(mathml):
+            if not mathml:
+                self._set_status("MathML not ready.", duration_ms=3000)
+                return
+            self._set_clipboard(mathml)
+            self._set_status("MathML copied.", duration_ms=3000)
+
+        js = f"window.getMathML({json.dumps(latex)});"
+        self.webview.page().runJavaScript(js, handle)
+
+    def _apply_deferred_result(self):
+        if self._deferred_result is None:
+            return
+        latex = self._deferred_result
+        self._deferred_result = None
+        self.latex_text.setPlainText(latex)
+
     def _on_ocr_error(self, message):
         self.progress.setVisible(False)
         self._set_status(f"OCR error: {message}")
@@ -703,12 +1545,17 @@ class LatexOCRWindow(QtWidgets.QMainWindow):
         loop.exec()
         return result["value"]
 
+    def _set_clipboard(self, text):
+        if self._soak_total:
+            return
+        QtGui.QGuiApplication.clipboard().setText(text)
+
     def copy_latex(self):
         latex = self.latex_text.toPlainText().strip()
         if not latex:
             self._set_status("No LaTeX to copy.", duration_ms=3000)
             return
-        QtGui.QGuiApplication.clipboard().setText(latex)
+        self._set_clipboard(latex)
         self._set_status("LaTeX copied.", duration_ms=3000)
 
     def copy_mathml(self):
@@ -720,7 +1567,7 @@ class LatexOCRWindow(QtWidgets.QMainWindow):
         if not mathml:
             self._set_status("MathML not ready.", duration_ms=3000)
             return
-        QtGui.QGuiApplication.clipboard().setText(mathml)
+        self._set_clipboard(mathml)
         self._set_status("MathML copied.", duration_ms=3000)
 
     def _show_output_hint(self, message, duration_ms=3000):
@@ -740,14 +1587,30 @@ class LatexOCRWindow(QtWidgets.QMainWindow):
         dialog = SettingsDialog(self.settings, self)
         if dialog.exec() == QtWidgets.QDialog.Accepted:
             values = dialog.get_values()
-            self.settings.data.update(values)
-            self.settings.save()
-            self._start_hotkey()
+            try:
+                errors = self.settings.update(values)
+            except OSError as exc:
+                self._set_status(f"Settings error: {exc}")
+                return
+            if errors:
+                self._on_settings_invalid(errors)
+                return
             self._set_status("Settings saved.")
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        QtCore.QTimer.singleShot(0, self._apply_deferred_result)
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QtCore.QEvent.WindowStateChange and not self.isMinimized():
+            QtCore.QTimer.singleShot(0, self._apply_deferred_result)
+
     def closeEvent(self, event):
         if self.hotkey_listener:
             self.hotkey_listener.stop()
+        if self.resource_monitor is not None:
+            self.resource_monitor.stop()
         super().closeEvent(event)
 
     def _capture_label(self):
@@ -760,9 +1623,27 @@ class LatexOCRWindow(QtWidgets.QMainWindow):
 
 
 def main():
-    app = QtWidgets.QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="LaTeXOCR")
+    parser.add_argument(
+        "--soak",
+        type=int,
+        default=0,
+        metavar="N",
+        help="drive N synthetic captures and report memory usage",
+    )
+    parser.add_argument(
+        "--soak-max-growth-mb",
+        type=float,
+        default=50,
+        metavar="MB",
+        help="exit with status 1 if RSS grows by more than MB during --soak",
+    )
+    args, qt_args = parser.parse_known_args()
+    app = QtWidgets.QApplication([sys.argv[0]] + qt_args)
     window = LatexOCRWindow()
     window.show()
+    if args.soak > 0:
+        window.start_soak(args.soak, args.soak_max_growth_mb)
     sys.exit(app.exec())
 
 
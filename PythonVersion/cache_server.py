@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class CacheStore:
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {}
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                raw = json.load(handle)
+            if isinstance(raw, dict):
+                self.data.update(raw)
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.data, handle, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def lookup(self, keys):
+        with self.lock:
+            return {key: self.data[key] for key in keys if key in self.data}
+
+    def publish(self, entries):
+        with self.lock:
+            for key, latex in entries:
+                self.data[key] = latex
+            self.save()
+
+
+class CacheRequestHandler(BaseHTTPRequestHandler):
+    store = None
+    max_body = 1024 * 1024
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self._send_json(400, {"error": "invalid body"})
+            return
+        if length <= 0 or length > self.max_body:
+            self._send_json(400, {"error": "invalid body"})
+            return
+        try:
+            body = json.loads(self.rfile.read(length).decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            self._send_json(400, {"error": "invalid json"})
+            return
+        if not isinstance(body, dict):
+            self._send_json(400, {"error": "invalid json"})
+            return
+        if self.path == "/lookup":
+            keys = body.get("keys")
+            if not isinstance(keys, list):
+                self._send_json(400, {"error": "keys must be a list"})
+                return
+            keys = [key for key in keys if isinstance(key, str)]
+            self._send_json(200, {"results": self.store.lookup(keys)})
+        elif self.path == "/publish":
+            items = body.get("entries")
+            if not isinstance(items, list):
+                self._send_json(400, {"error": "entries must be a list"})
+                return
+            entries = []
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                key = item.get("key")
+                latex = item.get("latex")
+                if isinstance(key, str) and isinstance(latex, str) and latex:
+                    entries.append((key, latex))
+            self.store.publish(entries)
+            self._send_json(200, {"stored": len(entries)})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LaTeXOCR shared cache server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--store", default="", help="JSON file to persist results")
+    args = parser.parse_args()
+
+    CacheRequestHandler.store = CacheStore(args.store or None)
+    server = ThreadingHTTPServer((args.host, args.port), CacheRequestHandler)
+    print(f"Shared cache listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()